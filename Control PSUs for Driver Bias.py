@@ -12,13 +12,29 @@ Parameters that need to be set:
     exp. if voltage_increment = 2 every press of the buttons will be 2 steps in the scale we use
 ~ psu_min_voltage -> Minimum voltage for all PSUs
 ~ psu_max_voltage -> Maximum voltage for all PSUs
+~ show_on_off_buttons -> If FALSE the On/Off state buttons are hidden
+~ outputs_on_with_confirm -> If TRUE all PSU outputs turn ON when the maximum value is confirmed
+    (needed to switch the outputs ON when the On/Off state buttons are hidden)
 ~ on_off_button_size -> On/Off state button size (px)
+~ checkbox_label -> Label of the reverse bias checkboxes (Keysight PSUs)
 ~ font_size -> Font size (px) for label fields
+~ update_interval -> Minimum time (ms) between voltage commands sent to a PSU while a slider is dragged,
+    the final value is sent when the slider is released
 ~ psu_ips -> Add the IP of the PSUs
+~ psu_timeout -> Timeout (ms) for the communication with the PSUs
+
+The parameters can also be given as a dict to create_app(), exp. create_app({'psu_max_voltage': 8}).
+The PSUs are connected when the GUI is created, importing this file does not open any PSU session.
 """
 
+import socket
 import sys
 import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Optional
 from PyQt5.QtCore import *
 from PyQt5.QtWidgets import *
 import pyvisa as visa
@@ -32,10 +48,13 @@ voltage_increment = 1  # step size
 psu_min_voltage = 0  # V
 psu_max_voltage = 10  # V
 
+show_on_off_buttons = True
+outputs_on_with_confirm = False
 on_off_button_size = 24  # pixels
+checkbox_label = '+/-'
 font_size = 20
 
-voltage_factor = pow(10, accuracy)
+update_interval = 50  # ms
 
 psu_ips = {
     1: {'ip_address': '192.168.0.120', 'channel': None, 'model': 'keysight'},
@@ -44,92 +63,350 @@ psu_ips = {
     4: {'ip_address': '192.168.0.122', 'channel': None, 'model': 'keysight'}
 }
 
+psu_timeout = 2000  # ms
+
 # Slider Title, Minimum Value, Maximum Value, Starting Value
+# None as Minimum/Maximum Value uses psu_min_voltage/psu_max_voltage, other values are kept within them
 sliders_info = [
-    (f'<b>Driver 1 bias: +0V</b>', psu_min_voltage, psu_max_voltage, 0),
-    (f'<b>Driver 2 bias: +0V</b>', psu_min_voltage, psu_max_voltage, 0),
-    (f'<b>Driver 3 bias: +0V</b>', psu_min_voltage, psu_max_voltage, 0),
-    (f'<b>Driver 4 bias: +0V</b>', psu_min_voltage, psu_max_voltage, 0)
+    ('Driver 1 bias', None, None, 0),
+    ('Driver 2 bias', None, None, 0),
+    ('Driver 3 bias', None, None, 0),
+    ('Driver 4 bias', None, None, 0)
 ]
 
-rm = visa.ResourceManager()
-
-PSU_1 = rm.open_resource(f'TCPIP0::{psu_ips[1]["ip_address"]}::inst0::INSTR')
-PSU_2 = rm.open_resource(f'TCPIP0::{psu_ips[2]["ip_address"]}::inst0::INSTR')
-PSU_3 = rm.open_resource(f'TCPIP0::{psu_ips[4]["ip_address"]}::inst0::INSTR')
+CONFIG_PARAMETERS = ('accuracy', 'close_psu_on_gui_close', 'psu_current_limit', 'voltage_increment',
+                     'psu_min_voltage', 'psu_max_voltage', 'show_on_off_buttons', 'outputs_on_with_confirm',
+                     'on_off_button_size', 'checkbox_label', 'font_size', 'update_interval', 'psu_ips',
+                     'psu_timeout', 'sliders_info')
+# Used when the PSUs are connected, they cannot change afterwards
+CONNECTION_PARAMETERS = ('psu_current_limit', 'psu_ips', 'psu_timeout')
+
+
+def apply_config(config):
+    # Overrides the parameters above and computes the values derived from them
+    global voltage_factor, BUTTON_STYLE_GRAY, BUTTON_STYLE_ON, BUTTON_STYLE_OFF, slider_settings
+
+    unknown = set(config) - set(CONFIG_PARAMETERS)
+    if unknown:
+        raise ValueError(f'Unknown parameters: {", ".join(sorted(unknown))}')
+    if PSU_TABLE and set(config) & set(CONNECTION_PARAMETERS):
+        raise ValueError('PSU connection parameters cannot change after the PSUs are connected')
+    globals().update(config)
+
+    voltage_factor = pow(10, accuracy)
+
+    # On/Off state button styles (gray: not used yet, green: ON, red: OFF)
+    BUTTON_STYLE_GRAY = f'background-color: gray; border-radius: {on_off_button_size // 2}px; padding: 0px;'
+    BUTTON_STYLE_ON = f'background-color: green; border-radius: {on_off_button_size // 2}px; padding: 0px;'
+    BUTTON_STYLE_OFF = f'background-color: red; border-radius: {on_off_button_size // 2}px; padding: 0px;'
+
+    # sliders_info with the slider ranges filled in and kept within the PSU voltage limits
+    slider_settings = [(title,
+                        psu_min_voltage if min_val is None else max(min_val, psu_min_voltage),
+                        psu_max_voltage if max_val is None else min(max_val, psu_max_voltage),
+                        init_val)
+                       for title, min_val, max_val, init_val in sliders_info]
+
+
+def configure_psu(PSU):
+    PSU.write_termination = '\n'
+    PSU.read_termination = '\n'
+    PSU.timeout = psu_timeout
+
+    # Disable Nagle's algorithm, so short SCPI commands are sent without delay.
+    # Only possible with the pyvisa-py backend, other backends keep their own socket settings.
+    try:
+        sock = PSU.visalib.sessions[PSU.session].interface.sock
+    except (AttributeError, KeyError):
+        return
+    sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+
+def open_psu(rm, ip_address):
+    PSU = rm.open_resource(f'TCPIP0::{ip_address}::inst0::INSTR')
+    configure_psu(PSU)
+    return PSU
 
 
-def get_correct_psu(psu_id):
-    PSU = None
-    if psu_id == 1:
-        PSU = PSU_1
-    elif psu_id == 2 or psu_id == 3:
-        PSU = PSU_2
-    elif psu_id == 4:
-        PSU = PSU_3
-    return PSU
+def format_voltage(value):
+    # Voltage string of a value in steps of 1 / voltage_factor V, using integer math only
+    sign = '-' if value < 0 else ''
+    volts, steps = divmod(abs(value), voltage_factor)
+    return f'{sign}{volts}.{steps:0{accuracy}d}' if accuracy else f'{sign}{volts}'
+
+
+def encode_command(PSU, command):
+    # write_raw() skips the str -> bytes conversion and termination of write()
+    return (command + PSU.write_termination).encode(PSU.encoding)
+
+
+def build_psu_commands(PSU, channel, is_keysight):
+    # SCPI commands of one PSU channel, built once. Templates are filled in with str.format()
+    if is_keysight:
+        voltage = ':SOUR:VOLT {}'
+        return {
+            'psu': PSU,
+            'keysight': True,
+            'init': f':SOUR:FUNC:MODE VOLT;:SENS:CURR:PROT {psu_current_limit};:OUTP OFF',
+            'voltage': voltage,
+            'zero': encode_command(PSU, voltage.format(0)),
+            'on': encode_command(PSU, ':OUTP ON'),
+            'off': encode_command(PSU, ':OUTP OFF'),
+            'close': ':OUTP OFF',
+            'reset': encode_command(PSU, f'{voltage.format(0)};:OUTP OFF'),
+            'ovp': None
+        }
+    voltage = f':SOUR{channel}:VOLT {{}}'
+    return {
+        'psu': PSU,
+        'keysight': False,
+        # Send the whole setup as one message, commands separated by ';'
+        'init': f':OUTPut:OVP:VAL CH{channel}, 1;'
+                f':OUTPut:OVP CH{channel}, ON;'
+                f':SOUR{channel}:CURR {psu_current_limit};'
+                f'{voltage};'
+                f':OUTP CH{channel}, OFF',
+        'voltage': voltage,
+        'zero': encode_command(PSU, voltage.format(0)),
+        'on': encode_command(PSU, f':OUTP CH{channel}, ON'),
+        'off': encode_command(PSU, f':OUTP CH{channel}, OFF'),
+        'close': f':OUTP CH{channel}, OFF',
+        'reset': encode_command(PSU, f'{voltage.format(0)};:OUTP CH{channel}, OFF'),
+        'ovp': f':OUTPut:OVP:VAL CH{channel}, {{}}'
+    }
+
+
+# Filled in by connect_psus()
+psu_handles = {}
+psu_connections = []  # PSU IDs that share one PSU connection
+PSU_TABLE = {}
+
+apply_config({})
+
+
+def connect_psus():
+    if PSU_TABLE:
+        return  # Already connected, every PSU has a single session
+
+    # PSU IDs with the same IP address are channels of one PSU and share its session
+    ip_groups = {}
+    for psu_id, info in psu_ips.items():
+        ip_groups.setdefault(info['ip_address'], []).append(psu_id)
+
+    rm = visa.ResourceManager()
+    # Open the PSUs in parallel, so startup waits only for the slowest connection
+    with ThreadPoolExecutor(max_workers=len(ip_groups)) as executor:
+        PSUs = list(executor.map(partial(open_psu, rm), ip_groups))
+
+    for PSU, psu_ids in zip(PSUs, ip_groups.values()):
+        for psu_id in psu_ids:
+            psu_handles[psu_id] = PSU
+        psu_connections.append(psu_ids)
+    PSU_TABLE.update({psu_id: build_psu_commands(psu_handles[psu_id], info['channel'], info['model'] == 'keysight')
+                      for psu_id, info in psu_ips.items()})
 
 
 def initialize_psu(psu_id, value):
-    PSU = get_correct_psu(psu_id)
+    psu = PSU_TABLE[psu_id]
 
-    if psu_ips[psu_id]['model'] == 'keysight':
-        PSU.write(':SOUR:FUNC:MODE VOLT')
-        PSU.write(f':SENS:CURR:PROT {psu_current_limit}')
-        PSU.write(':OUTP OFF')
+    if psu['keysight']:
+        psu['psu'].write(psu['init'])
     else:
-        PSU.write(f':OUTPut:OVP:VAL CH{psu_ips[psu_id]["channel"]}, 1')
-        PSU.write(f':OUTPut:OVP CH{psu_ips[psu_id]["channel"]}, ON')
-        PSU.write(f'SOUR{psu_ips[psu_id]["channel"]}:CURR {psu_current_limit}')
-        PSU.write(f'SOUR{psu_ips[psu_id]["channel"]}:VOLT {value / voltage_factor}')
-        PSU.write(f':OUTP CH{psu_ips[psu_id]["channel"]}, OFF')
+        psu['psu'].write(psu['init'].format(format_voltage(value)))
 
     print(f'PSU ID {psu_id} -> Initialized')
 
 
 def control_psu(psu_id, value, reverse_bias):
-    PSU = get_correct_psu(psu_id)
+    psu = PSU_TABLE[psu_id]
 
-    if psu_ips[psu_id]['model'] == 'keysight':
-        if value == 0:
-            PSU.write(f':SOUR:VOLT 0')
-        else:
-            if reverse_bias:
-                PSU.write(f':SOUR:VOLT -{value / voltage_factor}')
-            else:
-                PSU.write(f':SOUR:VOLT {value / voltage_factor}')
+    if value == 0:
+        psu['psu'].write_raw(psu['zero'])
+    elif psu['keysight'] and reverse_bias:
+        psu['psu'].write(psu['voltage'].format(format_voltage(-value)))
     else:
-        if value == 0:
-            PSU.write(f'SOUR{psu_ips[psu_id]["channel"]}:VOLT 0')
-        else:
-            PSU.write(f'SOUR{psu_ips[psu_id]["channel"]}:VOLT {value / voltage_factor}')
+        psu['psu'].write(psu['voltage'].format(format_voltage(value)))
+
+
+def set_psu_output(psu_id, state):
+    psu = PSU_TABLE[psu_id]
+    psu['psu'].write_raw(psu['on'] if state else psu['off'])
+
+
+def reset_psu(psu_id):
+    psu = PSU_TABLE[psu_id]
+    psu['psu'].write_raw(psu['reset'])
+
+
+def set_psu_ovp(psu_ids, ovp_value):
+    # Set the OVP of all channels of one PSU that support it with a single message
+    commands = [PSU_TABLE[psu_id]['ovp'].format(ovp_value) for psu_id in psu_ids if PSU_TABLE[psu_id]['ovp'] is not None]
+    if commands:
+        PSU_TABLE[psu_ids[0]]['psu'].write(';'.join(commands))
+
+
+def close_psu(psu_ids):
+    # Switch off all channels of one PSU with a single message
+    PSU = PSU_TABLE[psu_ids[0]]['psu']
+    PSU.write(';'.join(PSU_TABLE[psu_id]['close'] for psu_id in psu_ids))
+
+
+class PsuWorker(QObject):
+    """
+    Runs the commands of one PSU (all of its channels) in its own thread, so the GUI never waits for the
+    instruments and different PSUs are controlled concurrently.
+    The slots are called through the queued *_requested signals, emitted by the request_* methods.
+    Voltages are kept as the latest value per PSU ID, so a slow PSU never works through stale values.
+    Every other command starts a new batch of voltages, so voltages are never sent before or after the
+    commands they were requested around.
+    """
+    initialize_requested = pyqtSignal(int, int)
+    output_requested = pyqtSignal(int, bool)
+    reset_requested = pyqtSignal(int)
+    ovp_requested = pyqtSignal(str)
+    stop_requested = pyqtSignal(bool)
+    voltages_pending = pyqtSignal()
+
+    def __init__(self, psu_ids):
+        super().__init__()
+        self.psu_ids = psu_ids
+        self.voltage_batches = deque()  # One batch per queued voltages_pending
+        self.latest_voltages = None  # Batch that still accepts voltages
+        self.voltages_mutex = QMutex()
+        self.initialize_requested.connect(self.initialize)
+        self.output_requested.connect(self.set_output)
+        self.reset_requested.connect(self.reset)
+        self.ovp_requested.connect(self.set_ovp)
+        self.stop_requested.connect(self.stop)
+        self.voltages_pending.connect(self.write_voltages)
+
+    # The submit_voltage and request_* methods are called from the GUI thread
+
+    def submit_voltage(self, psu_id, value, reverse_bias):
+        # Replaces any voltage of this PSU that is not sent yet and not followed by another command
+        with QMutexLocker(self.voltages_mutex):
+            notify = self.latest_voltages is None
+            if notify:
+                self.latest_voltages = {}
+                self.voltage_batches.append(self.latest_voltages)
+            self.latest_voltages[psu_id] = (value, reverse_bias)
+        if notify:
+            self.voltages_pending.emit()
+
+    def end_voltage_batch(self):
+        # Voltages submitted after this are queued behind the next command
+        with QMutexLocker(self.voltages_mutex):
+            self.latest_voltages = None
+
+    def request_initialize(self, psu_id, value):
+        self.end_voltage_batch()
+        self.initialize_requested.emit(psu_id, value)
+
+    def request_output(self, psu_id, state):
+        self.end_voltage_batch()
+        self.output_requested.emit(psu_id, state)
+
+    def request_reset(self, psu_id):
+        self.end_voltage_batch()
+        self.reset_requested.emit(psu_id)
+
+    def request_ovp(self, ovp_value):
+        self.end_voltage_batch()
+        self.ovp_requested.emit(ovp_value)
+
+    def request_stop(self, close_outputs):
+        self.end_voltage_batch()
+        self.stop_requested.emit(close_outputs)
+
+    @pyqtSlot()
+    def write_voltages(self):
+        with QMutexLocker(self.voltages_mutex):
+            voltages = self.voltage_batches.popleft()
+            if voltages is self.latest_voltages:
+                self.latest_voltages = None
+        for psu_id, (value, reverse_bias) in voltages.items():
+            control_psu(psu_id, value, reverse_bias)
+
+    @pyqtSlot(int, int)
+    def initialize(self, psu_id, value):
+        initialize_psu(psu_id, value)
+
+    @pyqtSlot(int, bool)
+    def set_output(self, psu_id, state):
+        set_psu_output(psu_id, state)
+
+    @pyqtSlot(int)
+    def reset(self, psu_id):
+        reset_psu(psu_id)
+
+    @pyqtSlot(str)
+    def set_ovp(self, ovp_value):
+        set_psu_ovp(self.psu_ids, ovp_value)
+
+    @pyqtSlot(bool)
+    def stop(self, close_outputs):
+        if close_outputs:
+            close_psu(self.psu_ids)
+        self.thread().quit()
+
+
+@dataclass
+class DriverRow:
+    # Widgets and state of one driver (PSU channel) in the GUI
+    psu_id: int
+    psu_worker: PsuWorker
+    on_off_button: QPushButton
+    label: QLabel
+    reverse_checkbox: QCheckBox
+    slider: QSlider
+    plus_button: QPushButton
+    minus_button: QPushButton
+    update_timer: QTimer
+    label_prefix: str
+    on_state: bool = False
+    pending_value: Optional[tuple] = None  # (value, reverse_bias) waiting for the update timer
+
+    def show_voltage(self, value, reverse_bias):
+        voltage = format_voltage(-value if reverse_bias else value)
+        if not voltage.startswith('-'):
+            # 0V keeps the sign of the selected bias direction
+            voltage = ('-' if reverse_bias and value == 0 else '+') + voltage
+        self.label.setText(f'{self.label_prefix}: {voltage}V')
+
+    def set_enabled(self, enabled):
+        for widget in (self.on_off_button, self.label, self.reverse_checkbox, self.slider,
+                       self.plus_button, self.minus_button):
+            widget.setEnabled(enabled)
 
 
 class AppInterface(QWidget):
     def __init__(self):
         super().__init__()
 
+        connect_psus()
+
+        # Move the communication of every PSU to a separate thread
+        self.psu_threads = []
+        self.psu_workers = {}
+        for psu_ids in psu_connections:
+            psu_thread = QThread(self)
+            psu_worker = PsuWorker(psu_ids)
+            psu_worker.moveToThread(psu_thread)
+            psu_thread.finished.connect(psu_worker.deleteLater)
+            psu_thread.start()
+            self.psu_threads.append(psu_thread)
+            for psu_id in psu_ids:
+                self.psu_workers[psu_id] = psu_worker
+
         # Initialize parameters
-        self.on_off_buttons = None
-        self.psu_on_off_state = None
-        self.slider_labels = None
-        self.reverse_checkboxes = None
-        self.sliders = None
-        self.plus_buttons = None
-        self.minus_buttons = None
+        self.rows = None
         self.max_input_field = None
         self.confirm_button = None
 
         self.init_ui()
 
     def init_ui(self):
-        self.on_off_buttons = []
-        self.psu_on_off_state = []
-        self.slider_labels = []
-        self.reverse_checkboxes = []
-        self.sliders = []
-        self.plus_buttons = []
-        self.minus_buttons = []
+        self.rows = []
 
         self.setWindowTitle('Driver Biases')
         self.setGeometry(100, 100, 350, 400)
@@ -139,35 +416,27 @@ class AppInterface(QWidget):
         self.setLayout(main_layout)
 
         i = 1
-        for title, min_val, max_val, init_val in sliders_info:
+        for title, min_val, max_val, init_val in slider_settings:
             slider_title_layout = QHBoxLayout()
 
             on_off_button = QPushButton('', self)
-            on_off_button.setStyleSheet(f'background-color: gray; border-radius: {on_off_button_size // 2}px; padding: 0px;')
+            on_off_button.setStyleSheet(BUTTON_STYLE_GRAY)
             on_off_button.setFixedSize(on_off_button_size, on_off_button_size)
-            on_off_button.clicked.connect(lambda value, b_id=i: self.on_off_button_clicked(b_id))
+            on_off_button.setVisible(show_on_off_buttons)
             slider_title_layout.addWidget(on_off_button)
 
-            on_off_button.setEnabled(False)
-            self.psu_on_off_state.append(0)
-            self.on_off_buttons.append(on_off_button)
-
-            slider_label = QLabel(title, self)
-            slider_label.setStyleSheet(f'font-size: {font_size}px;')
+            # Plain text is used so Qt does not parse HTML on every voltage update
+            slider_label = QLabel(self)
+            slider_label.setTextFormat(Qt.PlainText)
+            slider_label.setStyleSheet(f'font-size: {font_size}px; font-weight: bold;')
             slider_label.setAlignment(Qt.AlignCenter)  # Align text in the center
             slider_title_layout.addWidget(slider_label)
 
-            slider_label.setEnabled(False)
-            self.slider_labels.append(slider_label)
-
-            checkbox = QCheckBox('+/-')
-            checkbox.stateChanged.connect(lambda value, s_label=slider_label, s_id=i: self.toggle_reverse_bias(s_label, s_id))
+            checkbox = QCheckBox(checkbox_label)
             slider_title_layout.addWidget(checkbox)
 
-            checkbox.setEnabled(False)
             if psu_ips[i]['model'] != 'keysight':
                 checkbox.setVisible(False)
-            self.reverse_checkboxes.append(checkbox)
 
             slider_value_control_layout = QHBoxLayout()
             slider = QSlider(Qt.Horizontal, self)  # Set orientation to horizontal
@@ -175,33 +444,37 @@ class AppInterface(QWidget):
             slider.setMinimum(min_val * voltage_factor)
             slider.setMaximum(max_val * voltage_factor)
             slider.setValue(int(init_val) * voltage_factor)
-            initialize_psu(i, int(init_val))
+            self.psu_workers[i].request_initialize(i, slider.value())
             slider.setTickPosition(QSlider.TicksBelow)
             slider.setTickInterval(voltage_factor)
-            slider.valueChanged.connect(lambda value, s_label=slider_label, s_id=i: self.update_slider_value(s_label, s_id, value, 'slider'))
             slider_value_control_layout.addWidget(slider)
 
-            slider.setEnabled(False)
-            self.sliders.append(slider)
-
             plus_button = QPushButton('+', self)
             plus_button.setFixedSize(40, 40)  # Square buttons
-            plus_button.clicked.connect(lambda value, s_label=slider_label, s_id=i, s=slider: self.update_slider_value(s_label, s_id, s.value() + voltage_increment, 'button'))
             slider_value_control_layout.addWidget(plus_button)
 
-            plus_button.setEnabled(False)
-            self.plus_buttons.append(plus_button)
-
             minus_button = QPushButton('-', self)
             minus_button.setFixedSize(40, 40)  # Square buttons
-            minus_button.clicked.connect(
-                lambda value, s_label=slider_label, s_id=i, s=slider: self.update_slider_value(s_label, s_id,
-                                                                                               s.value() - voltage_increment,
-                                                                                               'button'))
             slider_value_control_layout.addWidget(minus_button)
 
-            minus_button.setEnabled(False)
-            self.minus_buttons.append(minus_button)
+            # Only the latest value within the update interval is sent to the PSU
+            update_timer = QTimer(self)
+            update_timer.setSingleShot(True)
+            update_timer.setInterval(update_interval)
+
+            row = DriverRow(i, self.psu_workers[i], on_off_button, slider_label, checkbox, slider, plus_button, minus_button,
+                            update_timer, title)
+            row.show_voltage(slider.value(), False)
+            row.set_enabled(False)
+            self.rows.append(row)
+
+            on_off_button.clicked.connect(partial(self.on_off_button_clicked, row))
+            checkbox.stateChanged.connect(partial(self.toggle_reverse_bias, row))
+            slider.valueChanged.connect(partial(self.update_slider_value, row, mode='slider'))
+            slider.sliderReleased.connect(partial(self.slider_released, row))
+            plus_button.clicked.connect(partial(self.step_slider_value, row, voltage_increment))
+            minus_button.clicked.connect(partial(self.step_slider_value, row, -voltage_increment))
+            update_timer.timeout.connect(partial(self.send_pending_value, row))
 
             main_layout.addLayout(slider_title_layout)
             main_layout.addLayout(slider_value_control_layout)
@@ -232,81 +505,86 @@ class AppInterface(QWidget):
 
         self.show()
 
-    def on_off_button_clicked(self, button_id):
-        PSU = get_correct_psu(button_id)
-        if self.psu_on_off_state[button_id - 1] == 0:
-            if psu_ips[button_id]['model'] == 'keysight':
-                PSU.write(':OUTP ON')
-            else:
-                PSU.write(f':OUTP CH{psu_ips[button_id]["channel"]}, ON')
-            self.on_off_buttons[button_id - 1].setStyleSheet(
-                f'background-color: green; border-radius: {on_off_button_size // 2}px; padding: 0px;')
-            self.psu_on_off_state[button_id - 1] = 1
+    def on_off_button_clicked(self, row, checked=False):
+        if not row.on_state:
+            row.psu_worker.request_output(row.psu_id, True)
+            row.on_off_button.setStyleSheet(BUTTON_STYLE_ON)
+            row.on_state = True
         else:
-            if psu_ips[button_id]['model'] == 'keysight':
-                PSU.write(':OUTP OFF')
-            else:
-                PSU.write(f':OUTP CH{psu_ips[button_id]["channel"]}, OFF')
-            self.on_off_buttons[button_id - 1].setStyleSheet(
-                f'background-color: red; border-radius: {on_off_button_size // 2}px; padding: 0px;')
-            self.psu_on_off_state[button_id - 1] = 0
-
-    def update_slider_value(self, label, slider_id, value, mode):
+            row.psu_worker.request_output(row.psu_id, False)
+            row.on_off_button.setStyleSheet(BUTTON_STYLE_OFF)
+            row.on_state = False
+
+    def update_slider_value(self, row, value, mode):
         if mode == 'button':
-            self.sliders[slider_id - 1].setValue(value)
-            self.sliders[slider_id - 1].setValue(value)
-        reverse_bias = self.reverse_checkboxes[slider_id - 1].isChecked()
-        if reverse_bias:
-            label.setText(f'<b>{label.text().split(":")[0]}: -{value / voltage_factor}V</b>')
-        else:
-            label.setText(f'<b>{label.text().split(":")[0]}: +{value / voltage_factor}V</b>')
-        control_psu(slider_id, value, reverse_bias)
-
-    def toggle_reverse_bias(self, label, slider_id):
-        psu_id = slider_id
-        PSU = get_correct_psu(psu_id)
-        reverse_bias = self.reverse_checkboxes[slider_id - 1].isChecked()
-        if psu_ips[psu_id]['model'] == 'keysight':
-            PSU.write(f':SOUR:VOLT 0')
-            PSU.write(':OUTP OFF')
+            # Update the slider without its valueChanged signal calling this method again
+            with QSignalBlocker(row.slider):
+                row.slider.setValue(value)
+            value = row.slider.value()  # Clamped to the slider range
+        reverse_bias = row.reverse_checkbox.isChecked()
+        row.show_voltage(value, reverse_bias)
+        if mode == 'slider' and row.slider.isSliderDown():
+            # While dragging, only the latest value per update interval is sent
+            row.pending_value = (value, reverse_bias)
+            if not row.update_timer.isActive():
+                row.update_timer.start()
         else:
-            PSU.write(f'SOUR{psu_ips[psu_id]["channel"]}:VOLT 0')
-            PSU.write(f':OUTP CH{psu_ips[psu_id]["channel"]}, OFF')
-        self.sliders[slider_id - 1].setValue(0)
-        if reverse_bias:
-            label.setText(f'<b>{label.text().split(":")[0]}: -0V</b>')
-        else:
-            label.setText(f'<b>{label.text().split(":")[0]}: +0V</b>')
+            self.send_voltage(row, value, reverse_bias)
+
+    def step_slider_value(self, row, step, checked=False):
+        self.update_slider_value(row, row.slider.value() + step, 'button')
+
+    def slider_released(self, row):
+        self.send_voltage(row, row.slider.value(), row.reverse_checkbox.isChecked())
+
+    def send_voltage(self, row, value, reverse_bias):
+        row.update_timer.stop()
+        row.pending_value = None
+        row.psu_worker.submit_voltage(row.psu_id, value, reverse_bias)
+
+    def send_pending_value(self, row):
+        if row.pending_value is not None:
+            value, reverse_bias = row.pending_value
+            row.pending_value = None
+            row.psu_worker.submit_voltage(row.psu_id, value, reverse_bias)
+
+    def toggle_reverse_bias(self, row, state=None):
+        reverse_bias = row.reverse_checkbox.isChecked()
+        # The reset sets the PSU to 0V, so neither the slider nor a pending value sends another voltage
+        row.update_timer.stop()
+        row.pending_value = None
+        row.psu_worker.request_reset(row.psu_id)
+        # The reset also switches the output OFF
+        row.on_off_button.setStyleSheet(BUTTON_STYLE_OFF)
+        row.on_state = False
+        with QSignalBlocker(row.slider):
+            row.slider.setValue(0)
+        row.show_voltage(0, reverse_bias)
 
     def confirm_button_clicked(self):
-        timer = QTimer(self)
-        max_value = self.max_input_field.text()
-        psu_id = 1
-        accept = False
-        for slider in self.sliders:
-            if max_value and float(max_value) <= psu_max_voltage:
-                slider.setMaximum(int(float(max_value) * voltage_factor))
-                if psu_ips[psu_id]['model'] != 'keysight':
-                    PSU = get_correct_psu(psu_id)
-                    PSU.write(f':OUTPut:OVP:VAL CH{psu_ips[psu_id]["channel"]}, {float(max_value) + 0.1}')
-                # Change button background color to green
-                self.confirm_button.setStyleSheet('background-color: #90EE90')
-                timer.singleShot(500, self.reset_button_color)
-                accept = True
-            psu_id += 1
-        if accept:
-            for on_off_button in self.on_off_buttons:
-                on_off_button.setEnabled(True)
-            for slider_label in self.slider_labels:
-                slider_label.setEnabled(True)
-            for checkbox in self.reverse_checkboxes:
-                checkbox.setEnabled(True)
-            for slider in self.sliders:
-                slider.setEnabled(True)
-            for plus_button in self.plus_buttons:
-                plus_button.setEnabled(True)
-            for minus_button in self.minus_buttons:
-                minus_button.setEnabled(True)
+        try:
+            max_value = float(self.max_input_field.text())
+        except ValueError:
+            return  # Empty or not a number, nothing changes
+        if not psu_min_voltage <= max_value <= psu_max_voltage:
+            return  # Out of the PSU limits, also rejects nan and inf
+
+        max_slider_value = round(max_value * voltage_factor)
+        for row in self.rows:
+            row.slider.setMaximum(max_slider_value)
+        # OVP 0.1V above the maximum, formatted once with the slider accuracy (at least 0.1V)
+        ovp_value = f'{max_slider_value / voltage_factor + 0.1:.{max(accuracy, 1)}f}'
+        for psu_worker in set(self.psu_workers.values()):
+            psu_worker.request_ovp(ovp_value)
+
+        # Change button background color to green
+        self.confirm_button.setStyleSheet('background-color: #90EE90')
+        QTimer.singleShot(500, self.reset_button_color)
+
+        for row in self.rows:
+            row.set_enabled(True)
+            if outputs_on_with_confirm and not row.on_state:
+                self.on_off_button_clicked(row)
 
     def reset_button_color(self):
         # Revert button background color to default
@@ -314,15 +592,23 @@ class AppInterface(QWidget):
 
     def closeEvent(self, event, **kwargs):
         # Perform cleanup or other actions when the window is closed
-        if close_psu_on_gui_close:
-            PSU_1.write(':OUTP OFF')
-            PSU_2.write(f':OUTP CH1, OFF')
-            PSU_2.write(f':OUTP CH2, OFF')
-            PSU_3.write(':OUTP OFF')
+        # Pending PSU commands are sent before the PSU threads stop
+        for row in self.rows:
+            self.send_pending_value(row)
+        # All PSUs are closed at the same time, each by its own worker
+        for psu_worker in set(self.psu_workers.values()):
+            psu_worker.request_stop(close_psu_on_gui_close)
+        for psu_thread in self.psu_threads:
+            psu_thread.wait()
         event.accept()
 
 
+def create_app(config=None):
+    apply_config(config or {})
+    app = QApplication.instance() or QApplication(sys.argv)
+    return app, AppInterface()
+
+
 if __name__ == '__main__':
-    app = QApplication(sys.argv)
-    ex = AppInterface()
+    app, ex = create_app()
     sys.exit(app.exec_())